@@ -7,10 +7,8 @@ the configuration for the main Contextor functionality.
 
 import argparse
 import os
-import pathspec
 import sys
 import tomli
-from pathlib import Path
 from contextor import __version__
 
 from contextor.main import (
@@ -23,7 +21,7 @@ from contextor.selection import (
     write_scope_file,
     is_important_file,
 )
-from contextor.utils import scan_project_files
+from contextor.utils import scan_project_files, build_spec
 
 def get_version():
     """Get version from pyproject.toml."""
@@ -209,7 +207,7 @@ def run_cli():
         exclude_patterns = parse_patterns_file(args.exclude_file)
         patterns.extend(exclude_patterns)
 
-    spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns) if patterns else None
+    spec = build_spec(patterns)
  
     # Determine scope file path
     scope_file = args.scope_file or '.contextor_scope'
@@ -240,7 +238,8 @@ def run_cli():
         project_files = scan_project_files(
             directory, 
             spec, 
-            git_only_signatures=not args.all_signatures
+            git_only_signatures=not args.all_signatures,
+            collect_tree=not args.no_tree
         )
         
         # Determine preselected files
@@ -271,13 +270,16 @@ def run_cli():
         project_files = scan_project_files(
             directory, 
             spec, 
-            git_only_signatures=not args.all_signatures
+            git_only_signatures=not args.all_signatures,
+            collect_tree=not args.no_tree
         )
 
     # Extract signature candidates if available
     signature_candidates = None
+    tree_lines = None
     if project_files is not None:
         signature_candidates = project_files['signature_candidates']
+        tree_lines = project_files['tree']
 
     merge_files(
         files_to_merge, 
@@ -292,6 +294,7 @@ def run_cli():
         no_git_markers=args.no_git_markers,
         no_tree=args.no_tree,
         signature_candidates=signature_candidates,  # Pass the pre-scanned candidates
+        tree_lines=tree_lines,  # Reuse the tree built during the scan
     )
 
 if __name__ == "__main__":
@@ -16,7 +16,9 @@ def copy_to_clipboard(file_path, max_mb=2):
         if ans not in ('y', 'yes'):
             return False
     try:
-        with open(file_path, 'r', encoding='utf-8') as fp:
+        # Sources are copied into the context file as raw bytes, so it can
+        # hold non-UTF-8 content; replace it rather than fail the copy
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as fp:
             pyperclip.copy(fp.read())
         print('✓ Project scope copied to clipboard.')
         return True
@@ -5,9 +5,12 @@ A Python script that merges multiple files into a single output file while inclu
 a tree-like directory structure at the beginning.
 """
 
+import io
 import os, sys
-from pathlib import Path
-import pathspec
+import shutil
+import stat
+import tempfile
+import threading
 from datetime import datetime
 import re
 import pyperclip
@@ -15,13 +18,65 @@ import pyperclip
 from contextor.signatures import process_file_signatures, get_signature_files, generate_signatures_section
 from contextor.utils import (
     is_git_repo,
+    is_binary_file,
     get_git_tracked_files,
-    estimate_tokens,
+    estimate_tokens_from_size,
+    memoize_spec,
+    build_spec,
+    scan_project_files,
 )
-from contextor.selection import get_all_files
-from contextor.tree import generate_tree
+from contextor.selection import get_all_files, read_files_from_txt
+from contextor.tree import generate_tree, write_tree
 from contextor.clipboard import copy_to_clipboard
 
+# Chunk size used when copying file contents into the context file
+COPY_BUFFER_SIZE = 1 << 20
+
+# Write buffer for the context file and its temporary body, so the many
+# small tree and header writes reach the OS in large blocks
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+def copy_file_contents(src, dst):
+    """Append the rest of binary file src to binary file dst.
+
+    When both are regular files and os.sendfile is available, the bytes are
+    copied inside the kernel without passing through a Python buffer;
+    otherwise shutil.copyfileobj copies them in COPY_BUFFER_SIZE chunks.
+    """
+    dst.flush()
+    offset = None
+    try:
+        in_fd, out_fd = src.fileno(), dst.fileno()
+        if (hasattr(os, 'sendfile')
+                and stat.S_ISREG(os.fstat(in_fd).st_mode)
+                and stat.S_ISREG(os.fstat(out_fd).st_mode)):
+            offset = src.tell()
+    except (OSError, io.UnsupportedOperation):
+        pass
+    if offset is None:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        return
+
+    start = offset
+    try:
+        while True:
+            sent = os.sendfile(out_fd, in_fd, offset, COPY_BUFFER_SIZE)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError:
+        # Some platforms only sendfile to sockets; fall back if nothing
+        # has been written yet
+        if offset != start:
+            raise
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        return
+
+    # sendfile used the descriptors directly, so bring the buffered
+    # objects' positions back in line with them
+    src.seek(offset)
+    dst.seek(0, os.SEEK_END)
+
 def print_usage_tips():
     """Print helpful tips on how to effectively use the context file with AI assistants"""
     print("""
@@ -103,17 +158,44 @@ The following files are included in their entirety in this context:
             outfile.write(f"- {file_path}\n")
     outfile.write("\n")
 
+# Parsed pattern files keyed by absolute path, with the (mtime, size) they
+# were read at; the CLI and merge_files both read the same .gitignore
+_patterns_cache = {}
+_patterns_cache_lock = threading.Lock()
+
 def parse_patterns_file(patterns_file_path):
-    """Parse a patterns file and return a list of patterns"""
-    if not os.path.exists(patterns_file_path):
+    """Parse a patterns file and return a list of patterns
+
+    Results are cached until the file's modification time or size changes.
+    """
+    try:
+        file_stat = os.stat(patterns_file_path)
+    except OSError:
         return []
 
+    key = os.path.abspath(patterns_file_path)
+    version = (file_stat.st_mtime_ns, file_stat.st_size)
+    with _patterns_cache_lock:
+        cached = _patterns_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return list(cached[1])
+
     with open(patterns_file_path, 'r') as f:
         patterns = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+    with _patterns_cache_lock:
+        _patterns_cache[key] = (version, tuple(patterns))
     return patterns
 
 def calculate_total_size(file_paths):
-    """Calculate total size of files in bytes"""
+    """Calculate total size of files in bytes
+
+    file_paths may also be a dict of path -> size, such as the 'sizes'
+    from scan_project_files, in which case no file is stat'ed again.
+    """
+    if isinstance(file_paths, dict):
+        return sum(file_paths.values())
+
     total_size = 0
     for file_path in file_paths:
         try:
@@ -129,13 +211,19 @@ def ask_user_confirmation(total_size_mb):
     response = input("Do you want to continue? [y/N]: ").lower()
     return response in ['y', 'yes']
 
-def add_file_header(file_path):
-    """Add descriptive header before file content"""
+def add_file_header(file_path, file_stat=None):
+    """Add descriptive header before file content.
+
+    Pass file_stat when the caller already has a stat result for the file
+    to avoid statting it again.
+    """
+    if file_stat is None:
+        file_stat = os.stat(file_path)
     return f"""
 {'='*80}
 File: {file_path}
-Size: {os.path.getsize(file_path)} bytes
-Last modified: {datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')}
+Size: {file_stat.st_size} bytes
+Last modified: {datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')}
 {'='*80}
 
 """ 
@@ -145,8 +233,13 @@ def merge_files(file_paths, output_file='merged_file.txt', directory=None,
                 include_signatures=True, max_signature_files=None, 
                 md_heading_depth=3, git_only_signatures=True, 
                 no_git_markers=False, no_tree=False,
-                signature_candidates=None):  # Add signature_candidates parameter
-    """Merge files with conversation-friendly structure"""
+                signature_candidates=None,  # Add signature_candidates parameter
+                tree_lines=None):
+    """Merge files with conversation-friendly structure
+
+    tree_lines may hold a tree already built by scan_project_files(...,
+    collect_tree=True), in which case the directory isn't walked again.
+    """
     try:
         directory = directory or os.getcwd()
         patterns = []
@@ -160,50 +253,52 @@ def merge_files(file_paths, output_file='merged_file.txt', directory=None,
             exclude_patterns = parse_patterns_file(exclude_file)
             patterns.extend(exclude_patterns)
 
-        spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns) if patterns else None
+        spec = memoize_spec(build_spec(patterns))
 
         if file_paths is None:
             print("\nNo files specified. This will include all files in the directory (respecting .gitignore).")
             
-            all_files = get_all_files(directory, spec)
-            total_size = calculate_total_size(all_files)
+            # One walk gives the file list, the tree and signature candidates
+            project_files = scan_project_files(
+                directory,
+                spec,
+                git_only_signatures=git_only_signatures,
+                collect_tree=not no_tree and tree_lines is None
+            )
+            all_files = project_files['all_files']
+            if tree_lines is None:
+                tree_lines = project_files['tree']
+            if signature_candidates is None:
+                signature_candidates = project_files['signature_candidates']
+            total_size = calculate_total_size(project_files['sizes'])
             total_size_mb = total_size / (1024 * 1024)
             
             if not ask_user_confirmation(total_size_mb):
                 print("Operation cancelled by user.")
                 return
             
-            file_paths = all_files
+            # The scan returns files in walk order; sort once here so the
+            # context file is reproducible
+            file_paths = sorted(all_files)
             print(f"Including {len(file_paths)} files from directory...")
+        elif include_signatures and signature_candidates is None:
+            # Without pre-scanned candidates the signature section would
+            # walk the project on its own; scan once for them and the tree.
+            # Outside a git repo there is nothing to limit candidates to.
+            project_files = scan_project_files(
+                directory,
+                spec,
+                git_only_signatures=git_only_signatures and is_git_repo(directory),
+                collect_tree=not no_tree and tree_lines is None
+            )
+            signature_candidates = project_files['signature_candidates']
+            if tree_lines is None:
+                tree_lines = project_files['tree']
 
-        # Initialize content for token estimation
-        full_content = ""
+        git_tracked_files = None
+        if not no_tree and tree_lines is None and is_git_repo(directory):
+            git_tracked_files = get_git_tracked_files(directory)
 
-        # Generate tree output if not disabled
-        if not no_tree:
-            git_tracked_files = None
-            if is_git_repo(directory):
-                git_tracked_files = get_git_tracked_files(directory)
-            tree_output = '\n'.join(generate_tree(Path(directory), spec, git_tracked_files=git_tracked_files))
-            full_content += tree_output + "\n\n"
-
-        # Add file contents
-        full_content += "## Included File Contents\nThe following files are included in full:\n\n"
-        for file_path in file_paths:
-            if file_path.strip().startswith('#'):
-                continue
-
-            try:
-                if os.path.getsize(file_path) > 10 * 1024 * 1024:
-                    continue
-
-                full_content += add_file_header(file_path)
-                with open(file_path, 'r', encoding='utf-8') as infile:
-                    full_content += infile.read()
-                full_content += '\n\n'
-            except Exception as e:
-                print(f"Error reading file {file_path}: {str(e)}")
-        
         # Generate signatures section if enabled
         signatures_content = ""
         has_signatures = False
@@ -217,51 +312,77 @@ def merge_files(file_paths, output_file='merged_file.txt', directory=None,
                 git_only_signatures,
                 signature_candidates=signature_candidates  # Pass the candidates
             )
-            full_content += signatures_content
 
-        total_tokens = estimate_tokens(full_content)
+        # Everything below the conversation header goes to a temporary file
+        # first. The header carries the token estimate, which is derived from
+        # the size of the rest of the output, so each file is read only once.
+        with tempfile.TemporaryFile('w+', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8') as body:
+            # Pass text writes straight through to the underlying binary
+            # buffer so file contents can be copied into it in between
+            body.reconfigure(write_through=True)
 
-        # Now write the actual output file
-        with open(output_file, 'w', encoding='utf-8') as outfile:
-            # Write the conversation header
-            write_conversation_header(outfile, directory, total_tokens, has_signatures, no_tree)
-            
             # Write the tree structure if not disabled
             if not no_tree:
-                tree_output = '\n'.join(generate_tree(Path(directory), spec, '', git_tracked_files))
-                outfile.write(f"\n{tree_output}\n\n")
+                body.write("\n")
+                if tree_lines is not None:
+                    for line in tree_lines:
+                        body.write(line)
+                        body.write('\n')
+                else:
+                    write_tree(body, directory, spec, git_tracked_files)
+                body.write("\n")
             else:
-                outfile.write("\n## Available Files\nTree structure has been omitted.\n\n")
+                body.write("\n## Available Files\nTree structure has been omitted.\n\n")
             
             # Add section listing included files
-            write_included_files_section(outfile, file_paths, directory)
+            write_included_files_section(body, file_paths, directory)
             
             # Write file contents
-            outfile.write("## Included File Contents\nThe following files are included in full:\n\n")
+            body.write("## Included File Contents\nThe following files are included in full:\n\n")
 
             for file_path in file_paths:
                 if file_path.strip().startswith('#'):
                     continue
 
-                if not os.path.exists(file_path):
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
                     print(f"Warning: File not found - {file_path}")
                     continue
 
                 try:
-                    if os.path.getsize(file_path) > 10 * 1024 * 1024:
+                    if file_stat.st_size > 10 * 1024 * 1024:
                         print(f"Warning: Skipping large file ({file_path}) - size exceeds 10MB")
                         continue
 
-                    outfile.write(add_file_header(file_path))
-                    with open(file_path, 'r', encoding='utf-8') as infile:
-                        outfile.write(infile.read())
-                    outfile.write('\n\n')
+                    # Contents are copied as raw bytes, so binaries have to be
+                    # kept out explicitly
+                    if is_binary_file(file_path):
+                        print(f"Warning: Skipping binary file ({file_path})")
+                        continue
+
+                    body.write(add_file_header(file_path, file_stat))
+                    with open(file_path, 'rb') as infile:
+                        copy_file_contents(infile, body.buffer)
+                    body.write('\n\n')
                 except Exception as e:
                     print(f"Error reading file {file_path}: {str(e)}")
             
             # Write signatures section
             if signatures_content:
-                outfile.write(signatures_content)
+                body.write(signatures_content)
+
+            total_tokens = estimate_tokens_from_size(body.buffer.tell())
+
+            # Now write the actual output file
+            with open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as outfile:
+                outfile.reconfigure(write_through=True)
+
+                # Write the conversation header
+                write_conversation_header(outfile, directory, total_tokens, has_signatures, no_tree)
+
+                body.buffer.seek(0)
+                copy_file_contents(body.buffer, outfile.buffer)
 
         if total_tokens:
             print(f"\n✓ Estimated token count: {total_tokens:,}")
@@ -274,37 +395,6 @@ def merge_files(file_paths, output_file='merged_file.txt', directory=None,
     except Exception as e:
         print(f"Error creating context file: {str(e)}")
     
-def read_files_from_txt(file_path):
-    """Read list of files from a text file.
-    
-    Supports both plain paths and bullet-point format:
-        path/to/file.txt
-        - path/to/another_file.py
-        
-    Ignores:
-        - Empty lines
-        - Comment lines (starting with #)
-        - Lines that become empty after stripping
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            result = []
-            for line in f:
-                # Skip empty lines and comments
-                stripped_line = line.strip()
-                if not stripped_line or stripped_line.startswith('#'):
-                    continue
-                    
-                # Remove bullet point if present and strip again
-                cleaned_line = stripped_line.lstrip('- ').strip()
-                if cleaned_line:  # Add only non-empty lines
-                    result.append(cleaned_line)
-                    
-            return result
-    except Exception as e:
-        print(f"Error reading file list: {str(e)}")
-        return []
-
 if __name__ == "__main__":
     # Inform users that this isn't the right way to run the tool anymore
     print("Note: Running contextor directly from main.py is deprecated.")
@@ -7,36 +7,44 @@ smart selection.
 """
 
 import os
+import re
 import sys
-from pathlib import Path
 
-from contextor.utils import should_exclude, is_binary_file
+from contextor.utils import iter_project_files, is_binary_file
 
 
+# Entry point file names, matched against the lowercased base name
+IMPORTANT_FILE_NAMES = frozenset({
+    "main.py", "app.py", "index.py", "server.py",
+    "main.js", "index.js", "app.js",
+    "main.go", "main.rs", "main.cpp"
+})
+
+# Configuration files, matched against the end of the lowercased path
+IMPORTANT_FILE_SUFFIXES = (
+    ".yml", ".yaml", ".json", ".toml", ".ini", ".cfg",
+    "requirements.txt", "package.json", "cargo.toml", "go.mod"
+)
+
+# Documentation, matched anywhere in the lowercased path
+DOCUMENTATION_PATTERN = re.compile(
+    "readme|contributing|changelog|license|documentation|docs/|wiki/"
+)
+
 def is_important_file(file_path):
     """Determine if a file is likely to be important based on predefined rules."""
     path_lower = str(file_path).lower()
     
     # Entry points
-    if any(file in path_lower for file in [
-        "main.py", "app.py", "index.py", "server.py",
-        "main.js", "index.js", "app.js",
-        "main.go", "main.rs", "main.cpp"
-    ]):
+    if os.path.basename(path_lower) in IMPORTANT_FILE_NAMES:
         return True
     
     # Configuration files
-    if any(path_lower.endswith(ext) for ext in [
-        ".yml", ".yaml", ".json", ".toml", ".ini", ".cfg",
-        "requirements.txt", "package.json", "cargo.toml", "go.mod"
-    ]):
+    if path_lower.endswith(IMPORTANT_FILE_SUFFIXES):
         return True
     
     # Documentation
-    if any(doc in path_lower for doc in [
-        "readme", "contributing", "changelog", "license",
-        "documentation", "docs/", "wiki/"
-    ]):
+    if DOCUMENTATION_PATTERN.search(path_lower):
         return True
     
     return False
@@ -46,36 +54,33 @@ def get_all_files(directory, spec, smart_select=False):
     """Get list of all files in directory that aren't excluded by spec
     
     DEPRECATED: Use scan_project_files() from utils.py instead for better performance.
-    This function is kept for backward compatibility but performs duplicate os.walk().
+    This function is kept for backward compatibility but performs a duplicate directory walk.
     """
     files = []
-    for root, _, filenames in os.walk(directory):
-        for filename in filenames:
-            file_path = Path(os.path.join(root, filename))
-            
-            # Skip if excluded by gitignore patterns
-            if should_exclude(file_path, directory, spec):
-                continue
+    # scandir walk: file types come from the cached DirEntry and excluded
+    # directories are pruned before descending into them
+    for entry, _ in iter_project_files(directory, spec):
+        file_path = entry.path
 
-            # Skip binary files
-            if is_binary_file(str(file_path)):
-                continue
-                            
-            # Skip files larger than 10MB
-            try:
-                if file_path.stat().st_size > 10 * 1024 * 1024:
-                    print(f"Warning: Skipping large file ({file_path}) - size exceeds 10MB")
-                    continue
-            except OSError:
-                continue
-            
-            # Apply smart selection if enabled
-            if smart_select and not is_important_file(file_path):
+        # Skip binary files
+        if is_binary_file(file_path):
+            continue
+
+        # Skip files larger than 10MB
+        try:
+            if entry.stat().st_size > 10 * 1024 * 1024:
+                print(f"Warning: Skipping large file ({file_path}) - size exceeds 10MB")
                 continue
-                
-            files.append(str(file_path))
+        except OSError:
+            continue
+
+        # Apply smart selection if enabled
+        if smart_select and not is_important_file(file_path):
+            continue
+
+        files.append(file_path)
     
-    return sorted(files)
+    return files
 
 
 def read_scope_file(scope_file_path, directory):
@@ -214,14 +219,15 @@ def run_interactive_picker_with_files(all_files, directory, preselected_files=No
     else:
         checked_files = important_files
     
-    # Group files by directory for better organization
+    # Group files by directory for better organization, keeping each file's
+    # relative path so it's computed once rather than again for display
     file_groups = {}
     for file_path in all_files:
         rel_path = os.path.relpath(file_path, directory)
         dir_name = os.path.dirname(rel_path) or '.'
         if dir_name not in file_groups:
             file_groups[dir_name] = []
-        file_groups[dir_name].append(file_path)
+        file_groups[dir_name].append((file_path, rel_path))
     
     # Sort directories and files within directories
     sorted_groups = sorted(file_groups.keys())
@@ -233,9 +239,7 @@ def run_interactive_picker_with_files(all_files, directory, preselected_files=No
         choices.append(Separator(f"--- {group} ---"))
         
         # Add files in this directory
-        for file_path in sorted(file_groups[group]):
-            rel_path = os.path.relpath(file_path, directory)
-            
+        for file_path, rel_path in sorted(file_groups[group]):
             # Add a ✨ indicator for smart-selected files
             file_display = rel_path
             if file_path in important_files and preselected_files:
@@ -266,6 +270,14 @@ def run_interactive_picker_with_files(all_files, directory, preselected_files=No
         sys.exit(0)
 
 
+# One entry per line: leading whitespace and '-' bullets are dropped along
+# with trailing whitespace; blank lines and '#' comments never match.
+# [^\S\n] is whitespace other than a newline, so no match spans lines.
+FILE_LIST_ENTRY_PATTERN = re.compile(
+    r'^[^\S\n]*(?![#\s])[- ]*[^\S\n]*([^\n]*?)[^\S\n]*$',
+    re.MULTILINE
+)
+
 def read_files_from_txt(file_path):
     """Read list of files from a text file.
     
@@ -280,19 +292,9 @@ def read_files_from_txt(file_path):
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            result = []
-            for line in f:
-                # Skip empty lines and comments
-                stripped_line = line.strip()
-                if not stripped_line or stripped_line.startswith('#'):
-                    continue
-                    
-                # Remove bullet point if present and strip again
-                cleaned_line = stripped_line.lstrip('- ').strip()
-                if cleaned_line:  # Add only non-empty lines
-                    result.append(cleaned_line)
-                    
-            return result
+            content = f.read()
+        # Entries that were only bullets come out empty
+        return [entry for entry in FILE_LIST_ENTRY_PATTERN.findall(content) if entry]
     except Exception as e:
         print(f"Error reading file list: {str(e)}")
         return []
\ No newline at end of file
@@ -5,8 +5,8 @@ This module extracts function signatures, class definitions, and component
 structures from JavaScript and TypeScript files.
 """
 
+import io
 import re
-import signal
 from typing import Dict, List, Any, Optional
 
 try:
@@ -15,43 +15,84 @@ try:
 except ImportError:
     PARSER_AVAILABLE = False
 
-class TimeoutError(Exception):
-    pass
+# Patterns are compiled once at import time. No two adjacent quantifiers can
+# match the same characters (a '\s+' before free text is pinned with
+# '(?=\S)', and optional clauses are alternated with the plain '\s*' they
+# replace rather than followed by it), so a failing match gives up after one
+# pass instead of retrying every way of splitting a whitespace run.
+# Spans that run up to a closing delimiter (parameter lists, extends
+# clauses, JSX tags) and modifier chains are capped, so an unterminated
+# '(' can't make every later line start rescan the rest of the file.
 
-def timeout_handler(signum, frame):
-    raise TimeoutError("Regex operation timed out")
+# Match imports/exports at start of line or with whitespace before
+IMPORT_PATTERN = re.compile(r'^[ \t]*import\s+(?=\S)[^\n]*["\'][^"\'\n]*["\'];?[ \t]*$', re.MULTILINE)
+EXPORT_PATTERN = re.compile(r'^[ \t]*export\s+(?=\S)(?=[^\n]*\w|[^\n]*\{[^\n]*\})[^\n]*$', re.MULTILINE)
 
-def safe_regex_finditer(pattern, content, timeout_seconds=5):
-    """Run regex finditer with timeout protection."""
-    # Set up signal handler for timeout
-    old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(timeout_seconds)
-    
-    try:
-        matches = list(pattern.finditer(content))
-        return matches
-    except TimeoutError:
-        print(f"Warning: Regex operation timed out, skipping this extraction")
-        return []
-    finally:
-        signal.alarm(0)  # Cancel the alarm
-        signal.signal(signal.SIGALRM, old_handler)  # Restore old handler
+FUNCTION_PATTERNS = [
+    # Standard and exported functions (async optional)
+    (re.compile(r'^[ \t]*(?:export\s+(?:default\s+)?)?(?:async\s+)?function\s+(\w+)\s*\([^)]{0,1000}\)\s*{', re.MULTILINE), 'function'),
+    # Arrow functions (including async)
+    (re.compile(r'^[ \t]*(?:export\s+(?:default\s+)?)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]{0,1000}\)\s*=>', re.MULTILINE), 'arrow_function'),
+    # Class methods (including async)
+    (re.compile(r'^[ \t]+(?:async\s+)?(\w+)\s*\([^)]{0,1000}\)\s*{', re.MULTILINE), 'method')
+]
+
+# Match only top-level class declarations
+CLASS_PATTERN = re.compile(
+    r'^(?:[ \t]*|export\s+(?:default\s+)?)'  # Start of line with optional export
+    r'class\s+(\w+)'                      # Class name
+    r'(?:\s+extends\s([^{]{1,1000})|\s*)\{',  # Optional extends
+    re.MULTILINE
+)
+
+# Very simple method pattern
+METHOD_PATTERN = re.compile(
+    r'(?:^|(?<=\s))'                      # Start of line or after whitespace
+    r'(?!\/[\/\*])'                       # Not a comment
+    r'(?:(?:public|private|protected|static|async)\s+){0,5}'  # Optional modifiers
+    r'([a-zA-Z_$][\w$]*)'                # Method name
+    r'\s*\([^)]{0,1000}\)\s*{',  # Parameters and opening brace
+    re.MULTILINE
+)
+
+REACT_COMPONENT_PATTERNS = [
+    # Arrow function components with JSX
+    re.compile(
+        r'^[ \t]*(?:export\s+(?:default\s+)?)?(?:const|let|var)\s+(\w+)(?::\s*React\.?FC[^=]{0,1000}|\s*)'
+        r'=(?:\s*\([^)]{0,1000}\)\s*|[^=]{0,1000})=>\s*(?:\(\s*)?(?:<[^>]{1,1000}>|{)',
+        re.MULTILINE | re.DOTALL
+    ),
+    # Function declaration components with JSX
+    re.compile(
+        r'^[ \t]*(?:export\s+(?:default\s+)?)?function\s+(\w+)(?::\s*React\.?FC[^(]{0,1000}|\s*)'
+        r'\([^)]{0,1000}\)\s*(?::\s*(?:JSX\.Element|React\.ReactNode)\s*)?{\s*(?:return\s*)?(?:<[^>]{1,1000}>|{)',
+        re.MULTILINE | re.DOTALL
+    )
+]
+
+# Use a simpler, more efficient pattern that's less likely to cause backtracking
+INTERFACE_PATTERN = re.compile(
+    r'^[ \t]*(?:export\s+)?interface\s+(\w+)(?:\s+extends\s[\w\s,<>]{1,1000}|\s*)\{',
+    re.MULTILINE
+)
+
+BRACE_PATTERN = re.compile(r'[{}]')
+
+# Class bodies scanned for methods may add up to this many times the file size
+METHOD_SCAN_BUDGET_FACTOR = 4
+
+# How much of a .js file to look at when deciding whether it contains JSX
+JSX_SNIFF_SIZE = 8192
 
 def extract_imports_exports(content: str) -> Dict[str, List[str]]:
     """Extract import and export statements using regex."""
     imports = []
     exports = []
     
-    # Match imports/exports at start of line or with whitespace before
-    import_pattern = re.compile(r'^\s*import\s+.*?["\'].*?["\'];?\s*$', re.MULTILINE)
-    export_pattern = re.compile(r'^\s*export\s+(?:default\s+)?.*?(?:{.*?}|\w+.*?);?\s*$', re.MULTILINE)
-    
-    # Extract imports with timeout protection
-    for match in safe_regex_finditer(import_pattern, content):
+    for match in IMPORT_PATTERN.finditer(content):
         imports.append(match.group().strip())
     
-    # Extract exports with timeout protection
-    for match in safe_regex_finditer(export_pattern, content):
+    for match in EXPORT_PATTERN.finditer(content):
         exports.append(match.group().strip())
         
     return {
@@ -63,20 +104,17 @@ def extract_functions(content: str) -> List[Dict[str, str]]:
     """Extract function declarations using regex."""
     functions = []
     
-    # Match function declarations
-    patterns = [
-        # Standard and exported functions (async optional)
-        (r'^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?function\s+(\w+)\s*\([^)]*\)\s*{', 'function'),
-        # Arrow functions (including async)
-        (r'^\s*(?:export\s+(?:default\s+)?)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>', 'arrow_function'),
-        # Class methods (including async)
-        (r'^\s+(?:async\s+)?(\w+)\s*\([^)]*\)\s*{', 'method')
-    ]
+    # Methods only count as functions when they appear before the first
+    # 'class'/'interface' keyword; find that offset once instead of
+    # searching the content prefix for every match
+    container_end = min(
+        (idx + len(m) for m in ('class', 'interface') for idx in [content.find(m)] if idx >= 0),
+        default=len(content) + 1
+    )
     
-    for pattern, func_type in patterns:
-        regex = re.compile(pattern, re.MULTILINE)
-        for match in safe_regex_finditer(regex, content):
-            if func_type != 'method' or not any(m in content[:match.start()] for m in ['class', 'interface']):
+    for regex, func_type in FUNCTION_PATTERNS:
+        for match in regex.finditer(content):
+            if func_type != 'method' or match.start() < container_end:
                 functions.append({
                     "name": match.group(1),
                     "signature": match.group().strip(),
@@ -85,30 +123,33 @@ def extract_functions(content: str) -> List[Dict[str, str]]:
     
     return functions
 
+def _match_braces(content: str) -> Dict[int, int]:
+    """Map the offset of each '{' to the offset of its matching '}'.
+
+    One pass over the braces with a stack, so nested classes don't each
+    rescan the rest of the file for their closing brace.
+    """
+    closing = {}
+    stack = []
+    for brace in BRACE_PATTERN.finditer(content):
+        if brace.group() == '{':
+            stack.append(brace.start())
+        elif stack:
+            closing[stack.pop()] = brace.start()
+    return closing
+
 def extract_classes(content: str) -> List[Dict[str, Any]]:
     """Extract class declarations using regex."""
     classes = []
-    
-    # Match only top-level class declarations
-    class_pattern = re.compile(
-        r'^(?:\s*|export\s+(?:default\s+)?)'  # Start of line with optional export
-        r'class\s+(\w+)'                      # Class name
-        r'(?:\s+extends\s+([^{]+))?\s*{',     # Optional extends
-        re.MULTILINE
-    )
-    
-    # Very simple method pattern
-    method_pattern = re.compile(
-        r'(?:^|\s+)'                          # Start of line or whitespace
-        r'(?!\/[\/\*])'                       # Not a comment
-        r'(?:(?:public|private|protected|static|async)\s+)*'  # Optional modifiers
-        r'([a-zA-Z_$][\w$]*)'                # Method name
-        r'\s*\([^)]*\)\s*{',                 # Parameters and opening brace
-        re.MULTILINE
-    )
-    
-    # Find all top-level class declarations with timeout protection
-    for match in safe_regex_finditer(class_pattern, content):
+    closing_braces = None
+    # Nested class bodies overlap, so scanning each one in full is
+    # quadratic in the nesting depth; cap the total text scanned for methods
+    method_scan_budget = METHOD_SCAN_BUDGET_FACTOR * len(content)
+    
+    # Find all top-level class declarations
+    for match in CLASS_PATTERN.finditer(content):
+        if closing_braces is None:
+            closing_braces = _match_braces(content)
         class_name = match.group(1)
         extends_clause = match.group(2)
         start_pos = match.end()
@@ -116,26 +157,18 @@ def extract_classes(content: str) -> List[Dict[str, Any]]:
         # Clean up extends clause
         extends = extends_clause.strip() if extends_clause else None
         
-        # Find matching closing brace for class
-        brace_count = 1
-        end_pos = start_pos
-        for i in range(start_pos, min(start_pos + 10000, len(content))):  # Limit search range
-            if content[i] == '{':
-                brace_count += 1
-            elif content[i] == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    end_pos = i
-                    break
+        # Unterminated classes get an empty body
+        end_pos = closing_braces.get(start_pos - 1, start_pos)
         
-        # Extract class body (limit size to prevent hangs)
         class_body = content[start_pos:end_pos]
-        if len(class_body) > 50000:  # Skip very large class bodies
-            continue
         
-        # Extract methods from class body with timeout protection
+        # Extract methods from class body while the scan budget lasts
         methods = []
-        for method_match in safe_regex_finditer(method_pattern, class_body):
+        method_matches = ()
+        if len(class_body) <= method_scan_budget:
+            method_scan_budget -= len(class_body)
+            method_matches = METHOD_PATTERN.finditer(class_body)
+        for method_match in method_matches:
             method_name = method_match.group(1)
             method_line = method_match.group().strip()
             
@@ -170,20 +203,8 @@ def extract_react_functional_components(content: str) -> List[Dict[str, str]]:
     if len(content) > 100000:
         return components
     
-    # Patterns for React components
-    patterns = [
-        # Arrow function components with JSX
-        r'^\s*(?:export\s+(?:default\s+)?)?(?:const|let|var)\s+(\w+)(?::\s*React\.?FC[^=]*)?'
-        r'\s*=\s*(?:\([^)]*\)|[^=]*)\s*=>\s*(?:\(\s*)?(?:<[^>]+>|{)',
-        
-        # Function declaration components with JSX
-        r'^\s*(?:export\s+(?:default\s+)?)?function\s+(\w+)(?::\s*React\.?FC[^(]*)?'
-        r'\s*\([^)]*\)\s*(?::\s*(?:JSX\.Element|React\.ReactNode))?\s*{\s*(?:return\s*)?(?:<[^>]+>|{)'
-    ]
-    
-    for pattern in patterns:
-        regex = re.compile(pattern, re.MULTILINE | re.DOTALL)
-        for match in safe_regex_finditer(regex, content):
+    for regex in REACT_COMPONENT_PATTERNS:
+        for match in regex.finditer(content):
             components.append({
                 "name": match.group(1),
                 "signature": match.group().strip()
@@ -200,14 +221,7 @@ def extract_typescript_interfaces(content: str) -> List[Dict[str, str]]:
         print("Warning: File too large for interface extraction, skipping")
         return interfaces
     
-    # Use a simpler, more efficient pattern that's less likely to cause backtracking
-    interface_pattern = re.compile(
-        r'^\s*(?:export\s+)?interface\s+(\w+)(?:\s+extends\s+[\w\s,<>]+)?\s*\{',
-        re.MULTILINE
-    )
-    
-    # Extract interfaces with timeout protection
-    for match in safe_regex_finditer(interface_pattern, content):
+    for match in INTERFACE_PATTERN.finditer(content):
         interfaces.append({
             "name": match.group(1),
             "signature": match.group().split('{')[0].strip() + '{'
@@ -217,63 +231,66 @@ def extract_typescript_interfaces(content: str) -> List[Dict[str, str]]:
 
 def format_js_signatures(signatures: Dict[str, Any]) -> str:
     """Format JS/TS signatures into a readable string."""
-    formatted = []
+    buf = io.StringIO()
+    w = buf.write
     file_type = signatures["file_type"]
     
     # Add file type header
-    formatted.append(f"# {file_type}{' with JSX' if signatures['has_jsx'] else ''} File")
-    formatted.append("")
+    w(f"# {file_type}{' with JSX' if signatures['has_jsx'] else ''} File\n")
+    w("\n")
     
     # Format imports
     if signatures["imports"]:
-        formatted.append("## Imports")
+        w("## Imports\n")
         for import_stmt in signatures["imports"]:
-            formatted.append(import_stmt)
-        formatted.append("")
+            w(f"{import_stmt}\n")
+        w("\n")
     
     # Format exports
     if signatures["exports"]:
-        formatted.append("## Exports")
+        w("## Exports\n")
         for export_stmt in signatures["exports"]:
-            formatted.append(export_stmt)
-        formatted.append("")
+            w(f"{export_stmt}\n")
+        w("\n")
     
     # Format functions
     if signatures["functions"]:
-        formatted.append("## Functions")
+        w("## Functions\n")
         for func in signatures["functions"]:
-            formatted.append(func["signature"])
-        formatted.append("")
+            w(f"{func['signature']}\n")
+        w("\n")
     
     # Format React components
     if signatures.get("react_components"):
-        formatted.append("## React Components")
+        w("## React Components\n")
         for comp in signatures["react_components"]:
-            formatted.append(f"// {comp['name']} Component")
-            formatted.append(comp["signature"])
-            formatted.append("")
+            w(f"// {comp['name']} Component\n")
+            w(f"{comp['signature']}\n")
+            w("\n")
     
     # Format classes
     if signatures["classes"]:
-        formatted.append("## Classes")
+        w("## Classes\n")
         for cls in signatures["classes"]:
-            formatted.append(f"// {cls['name']}" + (" React Component" if cls.get("is_react_component") else ""))
-            formatted.append(cls["signature"])
+            w(f"// {cls['name']}" + (" React Component" if cls.get("is_react_component") else "") + "\n")
+            w(f"{cls['signature']}\n")
             
             if cls["methods"]:
                 for method in cls["methods"]:
-                    formatted.append(f"  {method['signature']}")
-            formatted.append("}")
-            formatted.append("")
+                    w(f"  {method['signature']}\n")
+            w("}\n")
+            w("\n")
     
     # Format TypeScript interfaces
     if "interfaces" in signatures and signatures["interfaces"]:
-        formatted.append("## TypeScript Interfaces")
+        w("## TypeScript Interfaces\n")
         for interface in signatures["interfaces"]:
-            formatted.append(interface["signature"])
-            formatted.append("")
+            w(f"{interface['signature']}\n")
+            w("\n")
     
-    return "\n".join(formatted)
+    # Every line above ends in a newline; drop the last one so the result
+    # reads the same as lines joined with '\n'
+    return buf.getvalue()[:-1]
 
 def process_js_file(file_path: str) -> str:
     """Process a JS/TS file and return formatted signatures."""
@@ -304,8 +321,18 @@ def get_js_signatures(file_path: str) -> Dict[str, Any]:
         }
     
     # Determine file type and features
-    is_typescript = file_path.lower().endswith(('.ts', '.tsx'))
-    has_jsx = bool(file_path.lower().endswith(('.jsx', '.tsx')) or '<' in content and '>' in content)
+    lower_path = file_path.lower()
+    is_typescript = lower_path.endswith(('.ts', '.tsx'))
+    # JSX is decided by extension; plain .ts can't contain JSX, and for .js
+    # only the head of the file is sniffed for closing/self-closing tags
+    # rather than scanning all of it for any '<' and '>'
+    if lower_path.endswith(('.jsx', '.tsx')):
+        has_jsx = True
+    elif lower_path.endswith('.js'):
+        head = content[:JSX_SNIFF_SIZE]
+        has_jsx = '</' in head or '/>' in head
+    else:
+        has_jsx = False
     
     result = {
         "imports": [],
@@ -318,7 +345,7 @@ def get_js_signatures(file_path: str) -> Dict[str, Any]:
     }
     
     try:
-        # Extract content using regex with timeout protection
+        # Extract content using regex
         imports_exports = extract_imports_exports(content)
         result["imports"] = imports_exports["imports"]
         result["exports"] = imports_exports["exports"]
@@ -7,7 +7,9 @@ signatures section to the output file.
 """
 
 import os
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 from typing import Dict, List, Optional, Set
 
 # Import signature extractors
@@ -17,12 +19,16 @@ from .javascript import process_js_file
 from .sql import process_sql_file
 
 from contextor.utils import (
-    should_exclude, 
+    should_exclude_rel,
     is_binary_file,
     is_git_repo,
     get_git_tracked_files,
 )
 
+# Below this many files the cost of starting worker processes outweighs
+# the gain from extracting signatures in parallel
+PARALLEL_MIN_FILES = 32
+
 def is_python_file(file_path: str) -> bool:
     """Check if file is a Python file."""
     return file_path.endswith('.py')
@@ -61,6 +67,32 @@ def process_file_signatures(file_path: str, max_depth: int = 3) -> Optional[str]
         # Not a supported file type
         return None
 
+def extract_signatures(file_paths: List[str], max_depth: int = 3) -> List[Optional[str]]:
+    """Extract signatures for many files, in parallel when there are enough.
+    
+    Extraction is CPU-bound regex/AST work, so it is spread across worker
+    processes rather than threads. Falls back to serial extraction for small
+    batches or when a process pool can't be started.
+    
+    Args:
+        file_paths: Paths of files to process
+        max_depth: Maximum heading depth for Markdown files
+        
+    Returns:
+        List of signature strings (or None) in the same order as file_paths
+    """
+    if len(file_paths) >= PARALLEL_MIN_FILES:
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(process_file_signatures, file_paths,
+                                         repeat(max_depth), chunksize=chunksize))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    
+    return [process_file_signatures(file_path, max_depth) for file_path in file_paths]
+
 def get_signature_files(directory: str, 
                         included_files: List[str], 
                         spec=None, 
@@ -89,38 +121,49 @@ def get_signature_files(directory: str,
     
     # Add Git tracking check
     git_tracked = set()
-    if git_only and is_git_repo(directory):
+    use_git_tracking = git_only and is_git_repo(directory)
+    if use_git_tracking:
         git_tracked = get_git_tracked_files(directory)
     
     # Priority lists to sort files by importance
     important_extensions = ['.py', '.js', '.ts', '.jsx', '.tsx', '.md', '.sql']
     
-    # Use os.walk with directory filtering
+    # Use top-down os.walk with directory filtering. Paths are matched in
+    # their project-relative form, built from the walk root, so pruning
+    # needs no extra stat or relpath call per entry.
+    base_len = len(os.fspath(directory).rstrip(os.sep) + os.sep)
     for root, dirnames, filenames in os.walk(directory):
+        rel_root = root[base_len:].replace(os.sep, '/')
+        if rel_root:
+            rel_root += '/'
+        # Join paths once per directory; files only need a concatenation
+        root_prefix = root if root.endswith(os.sep) else root + os.sep
+        abs_prefix = os.path.join(os.path.abspath(root), '')
+
         # Filter directories in-place to prevent walking into excluded dirs
         dirnames[:] = [d for d in dirnames 
-                      if not should_exclude(Path(os.path.join(root, d)), directory, spec)]
+                      if not should_exclude_rel(rel_root + d + '/', spec)]
         
         for filename in filenames:
-            file_path = os.path.join(root, filename)
-            abs_path = os.path.abspath(file_path)
+            file_path = root_prefix + filename
+            abs_path = abs_prefix + filename
             
             # Skip if already included in full (this check must come first)
             if abs_path in included_set:
                 continue
 
             # Skip if excluded by gitignore patterns
-            if should_exclude(Path(file_path), directory, spec):
+            rel_path = rel_root + filename
+            if should_exclude_rel(rel_path, spec):
                 continue
 
             # Skip binary files 
             if is_binary_file(file_path):
                 continue
 
-            # Skip if not git-tracked (using absolute path for comparison)
-            if git_only and is_git_repo(directory):
-                if abs_path not in git_tracked:
-                    continue
+            # Skip if not git-tracked (git reports project-relative posix paths)
+            if use_git_tracking and rel_path not in git_tracked:
+                continue
                 
             # Only include supported file types
             if not (is_python_file(file_path) or is_markdown_file(file_path) 
@@ -189,7 +232,9 @@ def filter_signature_candidates(signature_candidates: List[str],
         except ValueError:
             return len(important_extensions)
     
-    filtered_files.sort(key=get_priority)
+    # Candidates arrive in walk order, so break ties by path to keep the
+    # output (and which files survive the limit) deterministic
+    filtered_files.sort(key=lambda file_path: (get_priority(file_path), file_path))
     
     # Apply limit if specified and git_only is True (don't limit when --all-signatures is used)
     if max_files is not None and max_files >= 0 and git_only:
@@ -244,14 +289,15 @@ def generate_signatures_section(directory: str,
         ""
     ]
     
-    for file_path in signature_files:
+    all_signatures = extract_signatures(signature_files, md_depth)
+    
+    for file_path, signatures in zip(signature_files, all_signatures):
         rel_path = os.path.relpath(file_path, directory)
         content.extend([
             f"\n### {rel_path}",
             "```"
         ])
         
-        signatures = process_file_signatures(file_path, md_depth)
         if signatures:
             content.append(signatures)
         else:
@@ -5,56 +5,142 @@ This module provides functionality to generate tree-like directory
 structures with support for gitignore-style exclusions and Git tracking status.
 """
 
-from pathlib import Path
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def format_name(path, is_last, is_git_tracked=False):
-    """Format the name with proper tree symbols and Git tracking indicator."""
+def format_name(path, is_last, is_git_tracked=False, is_dir=None):
+    """Format the name with proper tree symbols and Git tracking indicator.
+
+    path can be a Path or an os.DirEntry; only .name and .is_dir() are used.
+    Pass is_dir when the caller already knows it to skip the lookup.
+    """
     prefix = '└── ' if is_last else '├── '
-    suffix = '/' if path.is_dir() else ''
+    if is_dir is None:
+        is_dir = path.is_dir()
+    suffix = '/' if is_dir else ''
     git_marker = ' ✓' if is_git_tracked else ''
     return prefix + path.name + suffix + git_marker
 
-def generate_tree(path, spec=None, prefix='', git_tracked_files=None):
-    """Generate tree-like directory structure string with gitignore-style exclusions"""
-    from contextor.utils import should_exclude  # Import here to avoid circular imports
-    
-    path = Path(path).resolve()
-    if not path.exists():
-        return []
+def iter_tree(path, spec=None, prefix='', git_tracked_files=None, files=None):
+    """Yield tree lines one at a time with gitignore-style exclusions.
+
+    Lines are produced depth-first as the directory is walked, so only the
+    current branch is held in memory rather than the whole tree.
 
-    entries = []
+    If files is a list, (DirEntry, rel_path) pairs for the regular files in
+    the tree are appended to it during the same walk, so callers that also
+    need the file list don't traverse the directory a second time.
+    """
+    if not os.path.exists(path):
+        return
 
     if not prefix:
-        entries.append(str(path))
+        yield os.path.realpath(path)
+
+    # Walk the path as given so collected entry paths keep the caller's form
+    yield from _iter_dir(os.fspath(path), '', spec, prefix, git_tracked_files, files)
+
+def _list_dir(dir_path, rel_prefix, spec):
+    """List one directory's entries that aren't excluded, in tree order.
+
+    Returns (is_file, sort_name, DirEntry, rel_path) tuples, directories
+    first. DirEntry caches the file type from the directory read, so sorting
+    and exclusion don't need to stat each entry again. Symlinks to
+    directories are shown, sorted and excluded as directories but not
+    expanded.
+    """
+    from contextor.utils import should_exclude_rel  # Import here to avoid circular imports
 
     items = []
     try:
-        for item in path.iterdir():
-            if not should_exclude(item, path, spec):
-                items.append(item)
-    except PermissionError:
-        return entries
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                is_dir = entry.is_dir()
+                rel_path = rel_prefix + entry.name + ('/' if is_dir else '')
+                if not should_exclude_rel(rel_path, spec):
+                    items.append((not is_dir, entry.name.lower(), entry, rel_path))
+    except OSError:
+        return None
 
-    items.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
+    items.sort(key=lambda item: item[:2])
+    return items
 
-    for index, item in enumerate(items):
+def _iter_items(items, spec, prefix, git_tracked_files, files=None, subtrees=None):
+    """Yield tree lines for listed entries, descending into directories.
+
+    subtrees maps a directory's rel_path to lines already collected for it
+    (see build_tree); other directories are walked here.
+    """
+    for index, (is_file, _, entry, rel_path) in enumerate(items):
         is_last = index == len(items) - 1
         
         # Check if file is Git-tracked when git_tracked_files is provided
         is_git_tracked = False
         if git_tracked_files is not None:
-            abs_path = str(item.resolve())
-            is_git_tracked = abs_path in git_tracked_files
+            is_git_tracked = rel_path in git_tracked_files
 
-        if prefix:
-            entries.append(prefix + format_name(item, is_last, is_git_tracked))
-        else:
-            entries.append(format_name(item, is_last, is_git_tracked))
+        yield prefix + format_name(entry, is_last, is_git_tracked, not is_file)
 
-        if item.is_dir():
+        if not is_file:
+            if entry.is_symlink():
+                continue
+            if subtrees is not None and rel_path in subtrees:
+                yield from subtrees[rel_path]
+                continue
             extension = '    ' if is_last else '│   '
-            new_prefix = prefix + extension
-            entries.extend(generate_tree(item, spec, new_prefix, git_tracked_files))
+            yield from _iter_dir(entry.path, rel_path, spec, prefix + extension, git_tracked_files, files)
+        elif files is not None and entry.is_file():
+            files.append((entry, rel_path))
+
+def _iter_dir(dir_path, rel_prefix, spec, prefix, git_tracked_files, files=None):
+    """Yield tree lines for the entries of one directory and its children."""
+    items = _list_dir(dir_path, rel_prefix, spec)
+    if items:
+        yield from _iter_items(items, spec, prefix, git_tracked_files, files)
+
+def build_tree(path, spec=None, git_tracked_files=None, files=None, max_workers=8):
+    """Build the full tree as a list, walking top-level subdirectories concurrently.
+
+    Produces the same lines (and the same files, though not in the same
+    order) as list(iter_tree(...)). Each top-level subdirectory's lines
+    are collected on a worker thread, since os.scandir releases the GIL,
+    and then emitted in tree order.
+    """
+    if not os.path.exists(path):
+        return []
+
+    items = _list_dir(os.fspath(path), '', spec) or []
+    subdirs = [
+        (index, entry, rel_path)
+        for index, (is_file, _, entry, rel_path) in enumerate(items)
+        if not is_file and not entry.is_symlink()
+    ]
+
+    def walk_subtree(subdir):
+        index, entry, rel_path = subdir
+        extension = '    ' if index == len(items) - 1 else '│   '
+        subtree_files = [] if files is not None else None
+        lines = list(_iter_dir(entry.path, rel_path, spec, extension, git_tracked_files, subtree_files))
+        return lines, subtree_files
+
+    subtrees = {}
+    if len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs))) as executor:
+            for (_, _, rel_path), (lines, subtree_files) in zip(subdirs, executor.map(walk_subtree, subdirs)):
+                subtrees[rel_path] = lines
+                if files is not None:
+                    files.extend(subtree_files)
+
+    tree = [os.path.realpath(path)]
+    tree.extend(_iter_items(items, spec, '', git_tracked_files, files, subtrees))
+    return tree
+
+def generate_tree(path, spec=None, prefix='', git_tracked_files=None):
+    """Generate tree-like directory structure string with gitignore-style exclusions"""
+    return list(iter_tree(path, spec, prefix, git_tracked_files))
 
-    return entries
\ No newline at end of file
+def write_tree(outfile, path, spec=None, git_tracked_files=None):
+    """Write the tree structure straight to outfile, one line at a time"""
+    for line in iter_tree(path, spec, git_tracked_files=git_tracked_files):
+        outfile.write(line)
+        outfile.write('\n')
@@ -1,7 +1,18 @@
+import functools
 import os
-import subprocess
 import re
-from pathlib import Path
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pathspec
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+from contextor.tree import build_tree
 
 DEFAULT_EXCLUSIONS = {
     '.git/',                  # Git metadata
@@ -18,6 +29,8 @@ DEFAULT_EXCLUSIONS = {
     'target/',                # Maven/other build output
     '.DS_Store',              # macOS metadata
     '.pytest_cache/',         # Pytest cache
+    '.mypy_cache/',           # Mypy cache
+    '.tox/',                  # Tox environments
     '.coverage/',             # Coverage reports
     'coverage/',              # Coverage reports (alternate location)
     'tmp/',                   # Temporary files
@@ -31,59 +44,304 @@ DEFAULT_EXCLUSIONS = {
     '*.lock'                  # Lock files like package-lock.json or yarn.lock    
 }
 
+# DEFAULT_EXCLUSIONS split by kind at import time so the hot paths can use
+# set lookups instead of re-interpreting every pattern per path. Every
+# default must be one of these kinds: plain names, 'name/', single-'*'
+# globs without a '/', or root-anchored 'a/b/' directories.
+_EXCLUDED_DIR_NAMES = frozenset(
+    p.rstrip('/') for p in DEFAULT_EXCLUSIONS
+    if p.endswith('/') and '/' not in p.rstrip('/') and '*' not in p
+)
+_EXCLUDED_FILE_NAMES = frozenset(
+    p for p in DEFAULT_EXCLUSIONS
+    if not p.endswith('/') and '*' not in p
+)
+# Single-'*' patterns without a '/' (e.g. '*.pyc') match one path component,
+# so they reduce to a (prefix, suffix) test on each component
+_WILDCARD_PATTERNS = tuple(
+    tuple(p.split('*', 1)) for p in DEFAULT_EXCLUSIONS
+    if p.count('*') == 1 and '/' not in p
+)
 
-def should_exclude(path, base_path, spec):
-    """Check if path should be excluded based on combined patterns and defaults"""
-    # First check against our hardcoded defaults
+# Marks the end of a pattern in the trie; can never be a path component
+_TRIE_END = ''
+
+def _build_dir_trie(patterns):
+    """Build a nested-dict trie from multi-component directory patterns"""
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for part in pattern.strip('/').split('/'):
+            node = node.setdefault(part, {})
+        node[_TRIE_END] = True
+    return trie
+
+# Directory patterns with an inner '/' are anchored at the project root
+# (gitignore semantics), so they are matched component by component from
+# the root instead of against every path prefix
+_EXCLUDED_DIR_TRIE = _build_dir_trie(
+    p for p in DEFAULT_EXCLUSIONS
+    if p.endswith('/') and '/' in p.rstrip('/') and '*' not in p
+)
+
+def _matches_wildcard(name, wildcards=_WILDCARD_PATTERNS):
+    """Check a single path component against (prefix, suffix) '*' patterns"""
+    for prefix, suffix in wildcards:
+        if (name.endswith(suffix) and name.startswith(prefix)
+                and len(name) >= len(prefix) + len(suffix)):
+            return True
+    return False
+
+
+# Named groups in pathspec's generated regexes (e.g. 'ps_d') repeat across
+# patterns and must become plain groups before the regexes can be joined
+_NAMED_GROUP_RE = re.compile(r'\(\?P<\w+>')
+
+def compile_spec(spec):
+    """Match all of a spec's exclude patterns with one combined regex.
+
+    pathspec tries every pattern in turn for each path. Here the regexes of
+    the non-negated patterns are joined into a single alternation, so a path
+    that matches none of them is rejected with one regex call. Negated
+    patterns make the last matching pattern decide, so when a spec has any,
+    paths that hit the combined regex are checked against the patterns from
+    last to first. pathspec's own match_file isn't used: its Hyperscan
+    backend shares one scratch space and fails when called from the
+    walker's threads.
+
+    If the optional hyperscan package is installed, the exclude patterns are
+    compiled into a single Hyperscan database instead, which scans a path
+    once no matter how many patterns there are.
+    """
+    if spec is None:
+        return None
+
+    includes = []
+    has_negation = False
+    for pattern in spec.patterns:
+        if pattern.include is None:
+            continue
+        regex = getattr(pattern, 'regex', None)
+        if not isinstance(regex, re.Pattern) or not isinstance(regex.pattern, str):
+            return spec  # Not a regex pattern we can combine; leave as is
+        if pattern.include:
+            includes.append(_NAMED_GROUP_RE.sub('(?:', regex.pattern))
+        else:
+            has_negation = True
+
+    if not includes:
+        # Only negations (or nothing): no path can be excluded
+        spec.match_file = lambda file: False
+        return spec
+
+    # Searched rather than matched, as pathspec does: some patterns (e.g.
+    # '*/') compile to regexes with no leading '^'
+    union_match = re.compile('|'.join(f'(?:{p})' for p in includes)).search
+    if HYPERSCAN_AVAILABLE:
+        union_match = _hyperscan_match(includes, union_match) or union_match
+    if has_negation:
+        decisions = [
+            (pattern.regex.search, pattern.include)
+            for pattern in reversed(spec.patterns) if pattern.include is not None
+        ]
+
+        def match_file(file):
+            if union_match(file) is None:
+                return False
+            for search, include in decisions:
+                if search(file) is not None:
+                    return include
+            return False
+
+        spec.match_file = match_file
+    else:
+        spec.match_file = lambda file: union_match(file) is not None
+    return spec
+
+def _hyperscan_match(regexes, fallback):
+    """Build a match function over a Hyperscan database of regexes.
+
+    Returns None if Hyperscan can't compile the expressions, so the caller
+    keeps its Python regex. Hyperscan works on bytes, so non-ASCII paths are
+    left to fallback, where character classes keep their per-character
+    meaning. Scratch space can't be shared between concurrent scans, so each
+    walker thread gets its own.
+    """
+    database = hyperscan.Database()
     try:
-        rel_path = path.relative_to(base_path)
-        rel_path_str = str(rel_path).replace(os.sep, '/')
-        if path.is_dir():
-            rel_path_str += '/'
-            
-        # Check against hardcoded exclusions first
-        for pattern in DEFAULT_EXCLUSIONS:
-            if pattern.endswith('/'):
-                # Directory match - check if path is inside this directory
-                if rel_path_str == pattern or rel_path_str.startswith(pattern):
-                    return True
-                # Also check if any parent directory matches
-                if '/' in rel_path_str:
-                    parts = rel_path_str.split('/')
-                    for i in range(len(parts)):
-                        parent_path = '/'.join(parts[:i+1]) + '/'
-                        if parent_path == pattern:
-                            return True
-            elif '*' in pattern:
-                # Simple wildcard matching
-                pattern_parts = pattern.split('*')
-                if len(pattern_parts) == 2:
-                    if rel_path_str.startswith(pattern_parts[0]) and rel_path_str.endswith(pattern_parts[1]):
-                        return True
-            else:
-                # Exact file match
-                if rel_path_str == pattern:
-                    return True
-        
-        # Then check against the provided spec
-        if spec is not None:
-            return spec.match_file(rel_path_str)
-    except ValueError:
-        pass
-    
+        database.compile(
+            expressions=[regex.encode('ascii') for regex in regexes],
+            ids=list(range(len(regexes))),
+            elements=len(regexes),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(regexes),
+        )
+    except (hyperscan.error, UnicodeEncodeError):
+        return None
+
+    local = threading.local()
+
+    def on_match(pattern_id, start, end, flags, context):
+        context.append(pattern_id)
+
+    def match(file):
+        if not file.isascii():
+            return fallback(file)
+        scratch = getattr(local, 'scratch', None)
+        if scratch is None:
+            scratch = local.scratch = hyperscan.Scratch(database)
+        hits = []
+        database.scan(file.encode('ascii'), match_event_handler=on_match,
+                      context=hits, scratch=scratch)
+        return hits or None
+
+    return match
+
+# Characters that make a gitignore pattern more than a plain name
+_GLOB_CHARS = frozenset('*?[]\\')
+
+class FastSpec:
+    """gitwildmatch spec that answers the common simple patterns without regex.
+
+    Most ignore files are plain names ('.env'), directory names
+    ('node_modules/') and extension globs ('*.pyc'). Those match single
+    path components, so they are checked with set lookups and
+    startswith/endswith; only the remaining patterns go through a compiled
+    PathSpec. With any negated pattern the order of patterns matters, so
+    everything is left to the PathSpec.
+    """
+
+    def __init__(self, patterns):
+        self.dir_names = set()    # 'name/': a directory with this name
+        self.names = set()        # 'name': a file or directory with this name
+        wildcards = []            # '*.ext' and similar: (prefix, suffix)
+        complex_patterns = []
+
+        lines = [line for line in patterns if line and not line.startswith('#')]
+        if any(line.startswith('!') for line in lines):
+            complex_patterns = lines
+        else:
+            for line in lines:
+                name = line[:-1] if line.endswith('/') else line
+                if (not name or '/' in name or line != line.strip()
+                        or name.count('*') > 1 or _GLOB_CHARS.intersection(name.replace('*', ''))):
+                    complex_patterns.append(line)
+                elif '*' in name:
+                    if line.endswith('/'):
+                        complex_patterns.append(line)
+                    else:
+                        wildcards.append(tuple(name.split('*', 1)))
+                elif line.endswith('/'):
+                    self.dir_names.add(name)
+                else:
+                    self.names.add(name)
+
+        self.wildcards = tuple(wildcards)
+        self.spec = (
+            compile_spec(pathspec.PathSpec.from_lines('gitwildmatch', complex_patterns))
+            if complex_patterns else None
+        )
+
+    def match_file(self, file):
+        """Check a project-relative path; directories carry a trailing '/'"""
+        is_dir = file.endswith('/')
+        parts = file.rstrip('/').split('/')
+        # 'name/' only matches directories: every component of a directory
+        # path, or the parent components of a file path
+        dir_parts = parts if is_dir else parts[:-1]
+        if self.dir_names and any(part in self.dir_names for part in dir_parts):
+            return True
+        for part in parts:
+            if part in self.names or (self.wildcards and _matches_wildcard(part, self.wildcards)):
+                return True
+        if self.spec is not None:
+            return self.spec.match_file(file)
+        return False
+
+def build_spec(patterns):
+    """Build a gitwildmatch spec from patterns, or None if there are none"""
+    if not patterns:
+        return None
+    return FastSpec(patterns)
+
+def memoize_spec(spec, maxsize=65536):
+    """Cache spec.match_file results per relative path string.
+
+    The same paths get matched by several passes in one run (file listing,
+    tree, signature fallback), so the spec's own match_file is wrapped in an
+    LRU cache on the instance. Build a new spec per run to start with a
+    fresh cache.
+    """
+    if spec is not None:
+        spec.match_file = functools.lru_cache(maxsize=maxsize)(spec.match_file)
+    return spec
+
+@functools.lru_cache(maxsize=65536)
+def _dir_excluded(rel_dir):
+    """Check a project-relative directory ('a/b', no trailing '/') against
+    the default exclusions.
+
+    Every file in a directory shares this decision, so it is cached per
+    directory and files below an excluded ancestor resolve with one lookup.
+    """
+    if not rel_dir:
+        return False
+    # Directory names are excluded at any depth, and slash-free patterns
+    # like '.DS_Store' or '*.lock' match directories too, so check every
+    # component while following the trie of root-anchored patterns - one pass, O(depth)
+    node = _EXCLUDED_DIR_TRIE
+    for part in rel_dir.split('/'):
+        if part in _EXCLUDED_DIR_NAMES or part in _EXCLUDED_FILE_NAMES or _matches_wildcard(part):
+            return True
+        if node is not None:
+            node = node.get(part)
+            if node is not None and _TRIE_END in node:
+                return True
     return False
 
+def should_exclude_rel(rel_path_str, spec):
+    """Check if a project-relative path should be excluded.
+
+    rel_path_str uses '/' as separator and directories carry a trailing '/',
+    which is the form both the defaults below and pathspec expect.
+    """
+    # Check against hardcoded exclusions first
+    if rel_path_str.endswith('/'):
+        if _dir_excluded(rel_path_str[:-1]):
+            return True
+    else:
+        rel_dir, _, name = rel_path_str.rpartition('/')
+        if name in _EXCLUDED_FILE_NAMES or _matches_wildcard(name) or _dir_excluded(rel_dir):
+            return True
+
+    # Then check against the provided spec
+    if spec is not None:
+        return spec.match_file(rel_path_str)
+    return False
+
+def should_exclude(path, base_path, spec):
+    """Check if path should be excluded based on combined patterns and defaults"""
+    path_str = os.fspath(path)
+    base_str = os.fspath(base_path).rstrip(os.sep) + os.sep
+    if not path_str.startswith(base_str):
+        return False
+
+    rel_path_str = path_str[len(base_str):].replace(os.sep, '/')
+    if os.path.isdir(path_str):
+        rel_path_str += '/'
+    return should_exclude_rel(rel_path_str, spec)
+
+# Extensions that are always treated as binary without reading the file
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg',
+    '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx',
+    '.zip', '.tar', '.gz', '.rar', '.7z', '.bin', '.exe', '.dll',
+    '.so', '.dylib', '.class', '.jar', '.pyc'
+})
+
 def is_binary_file(file_path):
     """Check if a file is likely to be binary based on extension or content"""
-    # First check extension
-    binary_extensions = {
-        '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg',
-        '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx',
-        '.zip', '.tar', '.gz', '.rar', '.7z', '.bin', '.exe', '.dll',
-        '.so', '.dylib', '.class', '.jar', '.pyc'
-    }
-    
-    if any(file_path.lower().endswith(ext) for ext in binary_extensions):
+    # First check extension - a single set lookup, no file access needed
+    if os.path.splitext(file_path)[1].lower() in BINARY_EXTENSIONS:
         return True
         
     # If extension check is inconclusive, look at file content
@@ -99,99 +357,201 @@ def is_git_repo(path):
     return os.path.isdir(os.path.join(path, '.git'))
 
 def get_git_tracked_files(path):
-    """Get set of Git-tracked files in repository."""
+    """Get set of Git-tracked files in repository.
+
+    Paths are returned exactly as git reports them: relative to the
+    repository root with '/' separators, so callers compare them against
+    project-relative paths instead of normalizing every entry.
+    """
     try:
         result = subprocess.run(
-            ['git', 'ls-files', '--full-name'], 
+            ['git', 'ls-files', '--full-name', '-z'], 
             cwd=path, 
             stdout=subprocess.PIPE, 
-            text=True,
             check=True
         )
-        # Convert all paths to normalized absolute paths
-        return set(os.path.normpath(os.path.abspath(os.path.join(path, f))) 
-                  for f in result.stdout.splitlines())
+        # NUL-separated output avoids git's quoting of unusual file names
+        return set(os.fsdecode(f) for f in result.stdout.split(b'\0') if f)
     except (subprocess.SubprocessError, FileNotFoundError):
         # Git command failed or git not installed
         return set()
     
+# Average number of characters (or UTF-8 bytes) per token for code and
+# English text with common tokenizers
+CHARS_PER_TOKEN = 4
+
 def estimate_tokens(text):
-    """Estimate the number of tokens in text using word-based approximation"""
-    # Split on whitespace and punctuation
-    words = re.findall(r'\w+|[^\w\s]', text)
-    # Use 0.75 as a conservative ratio (most GPT models average 0.75 tokens per word)
-    return int(len(words) / 0.75)
+    """Estimate the number of tokens in text from its length"""
+    return estimate_tokens_from_size(len(text))
 
+def estimate_tokens_from_size(num_bytes):
+    """Estimate the number of tokens in content of the given size in bytes"""
+    return num_bytes // CHARS_PER_TOKEN
+
+
+# Extensions (compared lowercased) that have a signature extractor; '.py'
+# is matched case-sensitively, as the Python extractor does
+SIGNATURE_EXTENSIONS = frozenset({
+    '.md', '.markdown',
+    '.js', '.jsx', '.ts', '.tsx',
+    '.sql'
+})
 
 def is_signature_file(file_path):
     """Check if file type is supported for signature extraction."""
-    return (file_path.endswith('.py') or 
-            file_path.lower().endswith(('.md', '.markdown')) or
-            file_path.lower().endswith(('.js', '.jsx', '.ts', '.tsx')) or
-            file_path.lower().endswith('.sql'))
+    ext = os.path.splitext(file_path)[1]
+    return ext == '.py' or ext.lower() in SIGNATURE_EXTENSIONS
+
+
+def _scan_dir(path, rel_prefix, spec):
+    """List one directory, split into included files and subdirectories.
+
+    Uses os.scandir so the file type comes from the cached DirEntry instead
+    of a separate stat call. Returns ([(DirEntry, rel_path)], [(path, rel_dir)]).
+
+    os.fwalk isn't used: its dir_fd-relative stats only help while the
+    directory fd is open, but callers stat and open files by path after the
+    walk, so the DirEntry objects must carry full paths.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return files, subdirs
+
+    for entry in entries:
+        name = entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if name in _EXCLUDED_DIR_NAMES:
+                continue
+            rel_dir = rel_prefix + name + '/'
+            if not should_exclude_rel(rel_dir, spec):
+                subdirs.append((entry.path, rel_dir))
+        elif entry.is_file():
+            rel_path = rel_prefix + name
+            if not should_exclude_rel(rel_path, spec):
+                files.append((entry, rel_path))
+    return files, subdirs
+
 
+def _walk(path, rel_prefix, spec):
+    """Recursively yield (DirEntry, rel_path) for files that aren't excluded.
 
-def scan_project_files(directory, spec=None, git_only_signatures=True):
+    Excluded directories are pruned before descending into them.
+    """
+    files, subdirs = _scan_dir(path, rel_prefix, spec)
+    yield from files
+    for subdir_path, rel_dir in subdirs:
+        yield from _walk(subdir_path, rel_dir, spec)
+
+
+# Upper bound on threads used to walk top-level subdirectories concurrently
+WALK_MAX_WORKERS = 8
+
+def _walk_parallel(directory, spec):
+    """Like _walk, but each top-level subdirectory is walked on its own thread.
+
+    os.scandir and stat release the GIL, so independent subtrees are read
+    concurrently. Returns a list of (DirEntry, rel_path) in no particular
+    order.
+    """
+    files, subdirs = _scan_dir(directory, '', spec)
+    if len(subdirs) < 2:
+        for subdir_path, rel_dir in subdirs:
+            files.extend(_walk(subdir_path, rel_dir, spec))
+        return files
+
+    def walk_subtree(subdir):
+        return list(_walk(subdir[0], subdir[1], spec))
+
+    with ThreadPoolExecutor(max_workers=min(WALK_MAX_WORKERS, len(subdirs))) as executor:
+        for subtree_files in executor.map(walk_subtree, subdirs):
+            files.extend(subtree_files)
+    return files
+
+
+def iter_project_files(directory, spec=None):
+    """Yield (DirEntry, rel_path) for every file in directory that isn't excluded.
+
+    rel_path is project-relative with '/' separators; excluded directories
+    are pruned without being listed.
+    """
+    return _walk(directory, '', spec)
+
+
+def scan_project_files(directory, spec=None, git_only_signatures=True, collect_tree=False):
     """Single pass through project to categorize all files.
     
     Args:
         directory: Project directory path
         spec: gitignore spec for exclusions
         git_only_signatures: Whether to only include Git-tracked files for signatures
+        collect_tree: Whether to also build the tree structure during the same walk
         
     Returns:
-        dict with 'all_files', 'signature_candidates', 'git_tracked'
+        dict with 'all_files', 'signature_candidates', 'git_tracked',
+        'tree' (list of tree lines, or None unless collect_tree is set) and
+        'sizes' (file size in bytes for each path in 'all_files').
+        File lists are in walk order; callers that need a stable order
+        sort them where it matters.
     """
     all_files = []
     signature_candidates = []
+    sizes = {}
     
     # Get git tracking info once if needed
     git_tracked = set()
     if is_git_repo(directory):
         git_tracked = get_git_tracked_files(directory)
     
-    # Single os.walk with directory filtering
-    for root, dirnames, filenames in os.walk(directory):
-        # Filter directories in-place to prevent walking into excluded dirs
-        # Check each directory and remove excluded ones
-        filtered_dirs = []
-        for d in dirnames:
-            dir_path = Path(os.path.join(root, d))
-            if not should_exclude(dir_path, directory, spec):
-                filtered_dirs.append(d)
-        dirnames[:] = filtered_dirs
-        
-        for filename in filenames:
-            file_path = os.path.join(root, filename)
-            abs_path = os.path.abspath(file_path)
-            
-            # Skip if excluded by gitignore patterns
-            if should_exclude(Path(file_path), directory, spec):
-                continue
+    # Single scandir pass with directory filtering; when the tree is wanted
+    # too, the tree walk collects the file entries instead of a second pass
+    tree = None
+    if collect_tree:
+        entries = []
+        tree = build_tree(directory, spec, git_tracked_files=git_tracked, files=entries,
+                          max_workers=WALK_MAX_WORKERS)
+    else:
+        entries = _walk_parallel(directory, spec)
+    
+    # Binary sniffing opens and reads every file, so run it on a thread pool
+    # to overlap the I/O
+    with ThreadPoolExecutor() as executor:
+        binary_flags = list(executor.map(is_binary_file, [entry.path for entry, _ in entries]))
+    
+    for (entry, rel_path), is_binary in zip(entries, binary_flags):
+        file_path = entry.path
 
-            # Skip binary files 
-            if is_binary_file(file_path):
-                continue
-                
-            # Skip files larger than 10MB
-            try:
-                if Path(file_path).stat().st_size > 10 * 1024 * 1024:
-                    print(f"Warning: Skipping large file ({file_path}) - size exceeds 10MB")
-                    continue
-            except OSError:
-                continue
-            
-            # Add to all_files (for interactive picker)
-            all_files.append(file_path)
+        # Skip binary files 
+        if is_binary:
+            continue
             
-            # Check if it's a signature candidate
-            if is_signature_file(file_path):
-                # If git_only_signatures, check git tracking
-                if not git_only_signatures or abs_path in git_tracked:
-                    signature_candidates.append(file_path)
+        # Skip files larger than 10MB
+        try:
+            file_size = entry.stat().st_size
+        except OSError:
+            continue
+        if file_size > 10 * 1024 * 1024:
+            print(f"Warning: Skipping large file ({file_path}) - size exceeds 10MB")
+            continue
+        
+        # Add to all_files (for interactive picker), keeping the size from
+        # the DirEntry so callers don't stat the file again
+        all_files.append(file_path)
+        sizes[file_path] = file_size
+        
+        # Check if it's a signature candidate
+        if is_signature_file(file_path):
+            # If git_only_signatures, check git tracking
+            if not git_only_signatures or rel_path in git_tracked:
+                signature_candidates.append(file_path)
     
     return {
-        'all_files': sorted(all_files),
-        'signature_candidates': sorted(signature_candidates),
-        'git_tracked': git_tracked
-    }
\ No newline at end of file
+        'all_files': all_files,
+        'signature_candidates': signature_candidates,
+        'git_tracked': git_tracked,
+        'tree': tree,
+        'sizes': sizes
+    }
@@ -252,6 +252,25 @@ def test_extract_classes_nested():
     assert classes[0]["name"] == "Outer"
     assert any(m["name"] == "someMethod" for m in classes[0]["methods"])
 
+def test_extract_classes_large_bodies():
+    """Test large and deeply nested class bodies are handled quickly."""
+    import time
+
+    # Methods throughout a class larger than the old 10,000-character cap
+    content = "class Big {\n" + "".join(f"    method{i}(x) {{ return x; }}\n" for i in range(3000)) + "}\n"
+    start_time = time.time()
+    classes = extract_classes(content)
+    assert len(classes[0]["methods"]) == 3000
+    assert classes[0]["methods"][-1]["name"] == "method2999"
+
+    # Deeply nested classes don't each rescan their parent's text
+    content = "class A {\n" * 16000 + "}\n" * 16000
+    classes = extract_classes(content)
+    assert len(classes) == 16000
+    elapsed_time = time.time() - start_time
+
+    assert elapsed_time < 1.0, f"Extraction took too long: {elapsed_time:.3f}s"
+
 def test_extract_react_components(js_file):
     """Test extraction of React functional components."""
     with open(js_file, 'r') as f:
@@ -344,4 +363,50 @@ def test_get_js_signatures_nonexistent_file():
 def test_process_js_file_error_handling():
     """Test error handling in JS file processing."""
     result = process_js_file("nonexistent.js")
-    assert "Error processing JavaScript/TypeScript file" in result
\ No newline at end of file
+    assert "Error processing JavaScript/TypeScript file" in result
+
+def test_get_js_signatures_jsx_detection(tmp_path, js_file):
+    """Test JSX detection by extension and content sniffing."""
+    # Plain .js with JSX markup is detected from its content
+    assert get_js_signatures(js_file)["has_jsx"] is True
+    
+    # Comparisons and generics alone don't count as JSX
+    plain_js = tmp_path / "plain.js"
+    plain_js.write_text("const ok = a < b && c > d;\n")
+    assert get_js_signatures(str(plain_js))["has_jsx"] is False
+    
+    plain_ts = tmp_path / "plain.ts"
+    plain_ts.write_text("const items: Array<string> = [];\n")
+    assert get_js_signatures(str(plain_ts))["has_jsx"] is False
+    
+    # .jsx/.tsx are always treated as JSX
+    component = tmp_path / "component.tsx"
+    component.write_text("export const x = 1;\n")
+    assert get_js_signatures(str(component))["has_jsx"] is True
+
+@pytest.mark.parametrize('content', [
+    "class A extends " + " " * 10000,
+    "interface A extends " + " " * 10000,
+    "const Foo = \n" + "    \n" * 2000 + "bar;",
+    "const Foo: React.FC" + " " * 10000,
+    "function Foo" + " " * 10000 + "()" + " " * 10000,
+    "import" + " \n" * 5000,
+    "export" + " \n" * 5000,
+    "class A {\n" + " a(\n" * 49000 + "}",
+    "class A {\n" + " static" * 28000 + "}",
+    "function a(\n" * 16000,
+], ids=['class_extends', 'interface_extends', 'react_arrow', 'react_fc', 'react_function', 'import', 'export',
+        'unclosed_params', 'modifier_chain', 'unclosed_function_params'])
+def test_extraction_unterminated_declarations_are_fast(content):
+    """Test that unterminated declarations don't trigger regex backtracking."""
+    import time
+    
+    start_time = time.time()
+    extract_imports_exports(content)
+    extract_functions(content)
+    extract_classes(content)
+    extract_react_functional_components(content)
+    extract_typescript_interfaces(content)
+    elapsed_time = time.time() - start_time
+    
+    assert elapsed_time < 1.0, f"Extraction took too long: {elapsed_time:.3f}s"
@@ -1,13 +1,16 @@
 """Test main functionality of Contextor"""
 import pytest
+import io
 import os
+import re
 import sys
 import subprocess
 import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, mock_open, MagicMock
 from pathspec import PathSpec
-from contextor.utils import should_exclude
+from contextor.utils import should_exclude, should_exclude_rel, build_spec, DEFAULT_EXCLUSIONS
 from contextor.main import (
     generate_tree,
     parse_patterns_file,
@@ -15,8 +18,10 @@ from contextor.main import (
     calculate_total_size,
     get_all_files,
     read_files_from_txt,
+    copy_file_contents,
 )
 from contextor.cli import parse_args
+from contextor import utils
 
 @pytest.fixture
 def test_dir():
@@ -55,6 +60,18 @@ def test_generate_tree(test_dir):
     for file_name in expected_files:
         assert any(file_name in line for line in tree), f"File {file_name} not found in tree"
 
+def test_generate_tree_symlinked_directory(test_dir):
+    """Test symlinked directories are listed and excluded as directories but not expanded"""
+    os.symlink(os.path.join(test_dir, "src"), os.path.join(test_dir, "linked"))
+    os.symlink(os.path.join(test_dir, "src"), os.path.join(test_dir, "src", "node_modules"))
+    spec = PathSpec.from_lines('gitwildmatch', ["node_modules/"])
+
+    tree = generate_tree(test_dir, spec)
+
+    assert tree.index("├── linked/") < tree.index("├── src/"), "Symlinked directory should sort with directories"
+    assert tree.count("│   ├── main.py") == 1, "Symlinked directory should not be expanded"
+    assert not any("node_modules" in line for line in tree), "Directory patterns should exclude symlinked directories"
+
 def test_parse_patterns_file(test_dir):
     """Test parsing of pattern files"""
     patterns_file = os.path.join(test_dir, "patterns.txt")
@@ -69,6 +86,11 @@ def test_parse_patterns_file(test_dir):
     assert "__pycache__/" in patterns, "__pycache__/ pattern not found"
     assert "#Comment" not in patterns, "Comment was incorrectly included"
 
+    # Cached results are refreshed when the file changes
+    with open(patterns_file, 'a') as f:
+        f.write("\nbuild/")
+    assert parse_patterns_file(patterns_file) == ["*.pyc", "__pycache__/", "build/"]
+
 def test_should_exclude(test_dir):
     """Test file exclusion logic"""
     patterns = ["*.pyc", "__pycache__/"]
@@ -86,6 +108,101 @@ def test_should_exclude(test_dir):
         result = should_exclude(test_file, test_dir, spec)
         assert result == should_be_excluded, f"Wrong exclusion for {filename}"
 
+@pytest.mark.parametrize('rel_path,excluded', [
+    # Default directory names are excluded at any depth, like unanchored gitignore patterns
+    ("build/", True),
+    ("src/pkg/build/", True),
+    ("src/pkg/build/module.py", True),
+    ("web/dist/app.js", True),
+    ("web/out/", True),
+    ("deep/tmp/a.txt", True),
+    ("x/target/", True),
+    ("src/coverage/index.html", True),
+    ("src/builder/module.py", False),
+    ("src/build.py", False),
+    # Default file names at any depth, as files or directories
+    ("a/b/.DS_Store", True),
+    ("a/.DS_Store/", True),
+    # Extension globs apply to files and directories alike
+    ("yarn.lock", True),
+    ("sub/poetry.lock", True),
+    ("a/x.lock/", True),
+    ("a/x.lock/notes.txt", True),
+    ("a/b/module.pyc", True),
+    ("a/weird.pyc/", True),
+    ("a.locked", False),
+    ("src/module.py", False),
+    # Multi-component directory defaults are anchored at the project root
+    ("__tests__/__snapshots__/", True),
+    ("__tests__/__snapshots__/x", True),
+    ("src/__tests__/__snapshots__/x", False),
+    ("__tests__/x", False),
+    ("__tests__/", False),
+])
+def test_should_exclude_rel_defaults(rel_path, excluded):
+    """Test default exclusions on project-relative paths at any depth"""
+    assert should_exclude_rel(rel_path, None) == excluded, f"Wrong exclusion for {rel_path}"
+
+def test_should_exclude_rel_defaults_match_pathspec():
+    """Test every default pattern is handled by the precomputed checks"""
+    reference = PathSpec.from_lines('gitwildmatch', DEFAULT_EXCLUSIONS)
+    for pattern in DEFAULT_EXCLUSIONS:
+        name = pattern.strip('/').replace('*', 'x')
+        suffix = '/' if pattern.endswith('/') else ''
+        for rel_path in (name + suffix, name + '/f.txt', 'a/' + name + suffix, 'a/' + name + '/f.txt'):
+            assert should_exclude_rel(rel_path, None) == reference.match_file(rel_path), f"Mismatch for {rel_path} ({pattern})"
+
+@pytest.mark.parametrize('patterns', [
+    ["*.pyc", "build/", "/docs/*.md"],
+    ["*.log", "!important.log", "logs/", "!logs/keep/"],
+    ["!only_negation.txt"],
+    ["node_modules/", ".env", "*.tmp", "src/generated/", "a*b.txt"],
+    ["*/"],
+    ["**/"],
+    ["*/", "!src/"],
+    ["caf\u00e9/", "*.m\u00e4"],
+])
+@pytest.mark.parametrize('use_hyperscan', [False, True], ids=['regex', 'hyperscan'])
+def test_build_spec_matches_pathspec(patterns, use_hyperscan, monkeypatch):
+    """Test the combined-regex spec agrees with pathspec's own matching"""
+    if use_hyperscan:
+        pytest.importorskip('hyperscan')
+    monkeypatch.setattr(utils, 'HYPERSCAN_AVAILABLE', use_hyperscan)
+    reference = PathSpec.from_lines('gitwildmatch', patterns)
+    spec = build_spec(patterns)
+
+    paths = [
+        "a.pyc", "src/a.pyc", "build/", "src/build/x.py", "docs/a.md",
+        "src/docs/a.md", "app.log", "important.log", "src/important.log",
+        "logs/", "logs/a.txt", "logs/keep/", "only_negation.txt", "main.py",
+        "node_modules/", "web/node_modules/x.js", "node_modules", ".env",
+        "config/.env", ".env/", "x.tmp", "cache/x.tmp/y", "src/generated/a.py",
+        "lib/src/generated/a.py", "ab.txt", "a-b.txt", "b.txt", "src/",
+        "src/a.py", "a/b.py", "a/", "x/src/y", "caf\u00e9/x.py", "src/caf\u00e9/",
+        "docs/\u00e9.md", "caf\u00e9.pyc", "a/b.m\u00e4", "b.ma"
+    ]
+    for path in paths:
+        assert spec.match_file(path) == reference.match_file(path), f"Mismatch for {path}"
+
+    # The walker matches from several threads at once
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(spec.match_file, paths * 20)) == [reference.match_file(p) for p in paths * 20]
+
+    assert build_spec([]) is None
+
+def test_hyperscan_match_falls_back():
+    """Test patterns Hyperscan rejects leave the Python regex in place"""
+    pytest.importorskip('hyperscan')
+    fallback = re.compile('x*').search
+
+    # Hyperscan refuses patterns that can match an empty string
+    assert utils._hyperscan_match(['^a(?:/|$)', 'x*'], fallback) is None
+
+    match = utils._hyperscan_match(['^a(?:/|$)', '(?:.+/)?b$'], lambda file: 'fallback')
+    assert match('a/x.py') and match('src/b') and not match('c')
+    # Non-ASCII paths are handed to the fallback
+    assert match('caf\u00e9/b') == 'fallback'
+
 def test_calculate_total_size(test_dir):
     """Test file size calculation"""
     files = [
@@ -95,6 +212,10 @@ def test_calculate_total_size(test_dir):
     total_size = calculate_total_size(files)
     assert total_size > 0, "Total size should be greater than 0"
 
+    # Pre-scanned sizes are summed without touching the files
+    sizes = {f: os.path.getsize(f) for f in files}
+    assert calculate_total_size(sizes) == total_size
+
 def test_get_all_files(test_dir):
     """Test getting all files respecting exclusions"""
     patterns = ["*.pyc", "__pycache__/"]
@@ -143,6 +264,47 @@ def test_merge_files_specific_files(test_dir):
         assert "# Documentation" in content, "README.md content missing"
         assert "def util()" not in content, "utils.py content shouldn't be included"
 
+def test_merge_files_skips_binary_files(test_dir):
+    """Test explicitly listed binary files are not copied into the output"""
+    output_file = os.path.join(test_dir, "output.txt")
+    png_file = os.path.join(test_dir, "logo.png")
+    nul_file = os.path.join(test_dir, "data.txt")
+    latin1_file = os.path.join(test_dir, "latin1.txt")
+    with open(png_file, 'wb') as f:
+        f.write(b"\x89PNG\r\n\x1a\nimage bytes")
+    with open(nul_file, 'wb') as f:
+        f.write(b"text\x00with nul")
+    with open(latin1_file, 'wb') as f:
+        f.write(b"caf\xe9")
+
+    merge_files([png_file, nul_file, latin1_file, os.path.join(test_dir, "src/main.py")],
+                output_file, test_dir, include_signatures=False)
+
+    with open(output_file, 'rb') as f:
+        content = f.read()
+    assert b"\x00" not in content, "NUL-containing file shouldn't be included"
+    assert b"image bytes" not in content, "PNG file shouldn't be included"
+    assert b"caf\xe9" in content, "Non-UTF-8 text should still be included"
+    assert b"print('main')" in content, "main.py content missing"
+
+def test_copy_file_contents(tmp_path):
+    """Test appending file contents between real files and in-memory buffers"""
+    src_path = tmp_path / "src.bin"
+    src_path.write_bytes(b"payload " * 100000)
+    dst_path = tmp_path / "dst.bin"
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        dst.write(b"header\n")
+        copy_file_contents(src, dst)
+        assert dst.tell() == len(b"header\n") + src_path.stat().st_size
+        dst.write(b"\nfooter")
+    assert dst_path.read_bytes() == b"header\n" + src_path.read_bytes() + b"\nfooter"
+
+    # Objects without a file descriptor fall back to a buffered copy
+    dst = io.BytesIO()
+    copy_file_contents(io.BytesIO(b"in memory"), dst)
+    assert dst.getvalue() == b"in memory"
+
 @pytest.mark.parametrize('test_content,expected_files', [
     ("""
     # Test files list
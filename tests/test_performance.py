@@ -11,9 +11,12 @@ import shutil
 from pathlib import Path
 import pathspec
 
-from contextor.utils import scan_project_files
+from contextor.utils import scan_project_files, _walk, _walk_parallel
 from contextor.main import parse_patterns_file
 from contextor.selection import is_important_file
+from contextor.tree import generate_tree, iter_tree, build_tree
+from contextor.signatures import process_file_signatures
+from contextor.signatures.processor import extract_signatures, PARALLEL_MIN_FILES
 
 
 class TestPerformanceOptimizations:
@@ -124,6 +127,36 @@ __pycache__/
         assert "package.json" not in signature_files_rel, "JSON files should not be signature candidates"
         assert ".gitignore" not in signature_files_rel, "Gitignore should not be signature candidate"
     
+    def test_scan_collects_tree_in_same_walk(self, large_test_project):
+        """Test that the tree built during the scan matches a separate tree walk."""
+        gitignore_patterns = parse_patterns_file(os.path.join(large_test_project, ".gitignore"))
+        spec = pathspec.PathSpec.from_lines('gitwildmatch', gitignore_patterns)
+
+        with_tree = scan_project_files(large_test_project, spec, git_only_signatures=False, collect_tree=True)
+        without_tree = scan_project_files(large_test_project, spec, git_only_signatures=False)
+
+        assert with_tree['tree'] == generate_tree(large_test_project, spec, git_tracked_files=set())
+        assert without_tree['tree'] is None
+        assert sorted(with_tree['all_files']) == sorted(without_tree['all_files'])
+        assert sorted(with_tree['signature_candidates']) == sorted(without_tree['signature_candidates'])
+
+    def test_parallel_walks_match_serial_walks(self, large_test_project):
+        """Test that the threaded walks find the same files as the serial ones."""
+        gitignore_patterns = parse_patterns_file(os.path.join(large_test_project, ".gitignore"))
+        spec = pathspec.PathSpec.from_lines('gitwildmatch', gitignore_patterns)
+
+        serial = sorted(rel_path for _, rel_path in _walk(large_test_project, '', spec))
+        parallel = sorted(rel_path for _, rel_path in _walk_parallel(large_test_project, spec))
+        assert parallel == serial
+        assert "src/app.py" in serial
+
+        serial_files = []
+        parallel_files = []
+        serial_tree = list(iter_tree(large_test_project, spec, files=serial_files))
+        parallel_tree = build_tree(large_test_project, spec, files=parallel_files, max_workers=4)
+        assert parallel_tree == serial_tree
+        assert sorted(rel_path for _, rel_path in parallel_files) == sorted(rel_path for _, rel_path in serial_files) == serial
+
     def test_important_file_detection(self):
         """Test important file detection for smart selection."""
         important_files = [
@@ -178,4 +211,17 @@ __pycache__/
         # Should not find any files in excluded deep directories
         all_files_rel = [os.path.relpath(f, large_test_project) for f in result['all_files']]
         deep_excluded_files = [f for f in all_files_rel if "very/deeply" in f or "very/deep" in f]
-        assert len(deep_excluded_files) == 0, f"Should not find files in deep excluded dirs: {deep_excluded_files}"
\ No newline at end of file
+        assert len(deep_excluded_files) == 0, f"Should not find files in deep excluded dirs: {deep_excluded_files}"
+    
+    def test_parallel_signature_extraction_matches_serial(self, tmp_path):
+        """Test that parallel signature extraction returns results in input order."""
+        file_paths = []
+        for i in range(PARALLEL_MIN_FILES + 4):
+            file_path = tmp_path / f"module_{i}.py"
+            file_path.write_text(f"def func_{i}(x):\n    return x\n")
+            file_paths.append(str(file_path))
+        
+        results = extract_signatures(file_paths)
+        
+        assert results == [process_file_signatures(f) for f in file_paths]
+        assert "def func_0(x):" in results[0]
@@ -66,6 +66,9 @@ def test_is_important_file():
     assert not is_important_file("temp.txt")
     assert not is_important_file("data.csv")
     assert not is_important_file("test_utils.py")
+    # Entry points match whole file names only
+    assert not is_important_file("src/domain.py")
+    assert not is_important_file("tests/test_main.py")
 
 def test_get_all_files(test_project):
     """Test file collection with exclusions."""